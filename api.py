@@ -1,4 +1,13 @@
-from flask import Flask, request, jsonify, send_from_directory
+from flask import (
+    Blueprint,
+    Flask,
+    Response,
+    current_app,
+    request,
+    jsonify,
+    send_from_directory,
+    stream_with_context,
+)
 from flask_jwt_extended import (
     JWTManager,
     create_access_token,
@@ -10,7 +19,7 @@ import logging
 import database
 import os
 from ffmpeg import ffmpeg_process_video, create_unique_file
-import pywebpush
+from stream import follow_video_file
 import json
 import threading
 
@@ -20,32 +29,55 @@ UPLOAD_FOLDER = "./resources/input"
 OUTPUT_FOLDER = "./resources/output"
 RES_FOLDER = "./resources"
 
-app = Flask(__name__)
-app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
-app.config["OUTPUT_FOLDER"] = OUTPUT_FOLDER
-app.config["RES_FOLDER"] = RES_FOLDER
-app.config[
-    "JWT_SECRET_KEY"
-] = "7xquF94FFn9mct3QKtxK8yNRqXZMxRpPnoaytp2ohhVRgA3G32fta8YdcYyQy4a6GEpNEJFTAuAiTmVnFwyMTj6bXgakWVGCNqHu"
+bp = Blueprint("api", __name__)
+jwt = JWTManager()
 
-jwt = JWTManager(app)
 
-# Initialize the project
-database.db_initialize()
+def create_app():
+    """
+    Create and configure the Flask application.
 
+    Building the app, initializing the database and registering the routes
+    happens here instead of at import time, so modules that only need the
+    processing path (see worker.py) can be imported without side effects.
 
-def send_push_notificatio(subscription_info, msg):
-    logging.info("send_push_notificatio(): Sending push notification")
-    try:
-        pywebpush.webpush(
-            subscription_info=subscription_info,
-            data=msg,
-        )
-    except Exception as e:
-        logging.error(f"send_push_notificatio(): Error sending push notification: {e}")
+    Returns:
+        Flask: The configured application.
+    """
+    app = Flask(__name__)
+    app.config["UPLOAD_FOLDER"] = UPLOAD_FOLDER
+    app.config["OUTPUT_FOLDER"] = OUTPUT_FOLDER
+    app.config["RES_FOLDER"] = RES_FOLDER
+    # ENQUEUE_ONLY=1: edit_video only records operations, worker.py processes them
+    app.config["ENQUEUE_ONLY"] = os.environ.get("ENQUEUE_ONLY", "0") == "1"
+    app.config[
+        "JWT_SECRET_KEY"
+    ] = "7xquF94FFn9mct3QKtxK8yNRqXZMxRpPnoaytp2ohhVRgA3G32fta8YdcYyQy4a6GEpNEJFTAuAiTmVnFwyMTj6bXgakWVGCNqHu"
+
+    jwt.init_app(app)
+
+    # Initialize the project
+    database.db_initialize()
 
+    app.register_blueprint(bp)
+    return app
+
+
+def get_output_path(processed_video_url):
+    """
+    Resolve a processed video URL to its absolute path on disk.
 
-@app.route("/register", methods=["POST"])
+    Args:
+        processed_video_url (str): The processed video path relative to the resources directory.
+
+    Returns:
+        str: The absolute path of the processed video.
+    """
+    resources_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), "resources")
+    return os.path.join(resources_dir, processed_video_url.strip("./"))
+
+
+@bp.route("/register", methods=["POST"])
 def register_user():
     """
     Register a new user.
@@ -79,7 +111,7 @@ def register_user():
             conn.close()
 
 
-@app.route("/user", methods=["POST"])
+@bp.route("/user", methods=["POST"])
 def authenticate_user():
     """
     Authenticates a user based on the provided email and hashed password.
@@ -110,7 +142,7 @@ def authenticate_user():
         conn.close()
 
 
-@app.route("/user/upload", methods=["POST"])
+@bp.route("/user/upload", methods=["POST"])
 @jwt_required()
 def upload_file():
     """
@@ -129,7 +161,7 @@ def upload_file():
             return jsonify({"error": "No selected file"}), 400
         else:
             filename = secure_filename(file.filename)
-            file_path = os.path.join(app.config["UPLOAD_FOLDER"], filename)
+            file_path = os.path.join(current_app.config["UPLOAD_FOLDER"], filename)
             file.save(file_path)
             logging.info(f"upload_file(): File {filename} uploaded successfully")
             return jsonify({"message": "File uploaded successfully"}), 200
@@ -138,7 +170,7 @@ def upload_file():
         logging.error(f"upload_file(): {e}")
 
 
-@app.route("/user/edit_video", methods=["POST"])
+@bp.route("/user/edit_video", methods=["POST"])
 @jwt_required()
 def edit_video():
     """
@@ -148,8 +180,11 @@ def edit_video():
     It retrieves the user's email from the JWT token and gets the corresponding user ID from the database.
     If the user is not found, it returns a 404 error.
     The request payload should contain the source file path, start time, and end time for the video editing.
+    An optional `fragmented` flag writes a fragmented MP4 that can be streamed from
+    `/user/stream_video` while it is still being processed.
     It creates a unique output file path and adds the video editing operation to the database.
-    Then, it calls the `ffmpeg_process_video` function to process the video using the provided parameters.
+    Then, it calls the `ffmpeg_process_video` function to process the video using the provided parameters,
+    unless the app runs with ENQUEUE_ONLY, in which case worker.py processes the operation.
 
     Returns:
         A JSON response with the success status and the edited video URL.
@@ -165,22 +200,35 @@ def edit_video():
         src_file_path = data.get("src_file_path")
         start_time = data.get("start_time")
         end_time = data.get("end_time")
+        fragmented = data.get("fragmented", False)
+        if not isinstance(fragmented, bool):
+            return jsonify({"error": "fragmented must be a boolean"}), 400
 
         output_file = create_unique_file(parent_folder="./output")
 
         operation_id = database.db_add_operation(
-            user_id, src_file_path, start_time, end_time, output_file
+            user_id,
+            src_file_path,
+            start_time,
+            end_time,
+            output_file,
+            fragmented=fragmented,
         )
 
+        if current_app.config["ENQUEUE_ONLY"]:
+            logging.info(f"edit_video(): Enqueued operation {operation_id}")
+            return jsonify({"success": True, "operation_id": operation_id}), 200
+
         thread = threading.Thread(
             target=ffmpeg_process_video,
             args=(
                 src_file_path,
                 start_time,
                 end_time,
-                app.config["RES_FOLDER"],
+                current_app.config["RES_FOLDER"],
                 output_file,
                 user_email,
+                fragmented,
             ),
         )
         logging.info("edit_video(): Starting thread")
@@ -192,7 +240,7 @@ def edit_video():
         return jsonify({"error": "Internal Server Error"}), 500
 
 
-@app.route("/user/download_video", methods=["GET"])
+@bp.route("/user/download_video", methods=["GET"])
 @jwt_required()
 def download_video():
     """
@@ -201,25 +249,24 @@ def download_video():
     Returns:
         If the video file is found, it is returned as an attachment for download.
         If the video file is not found, a JSON response with an error message and status code 404 is returned.
+        If processing the video failed, a JSON response with an error message and status code 500 is returned.
         If any other error occurs, a JSON response with an error message and status code 500 is returned.
     """
     try:
         user_email = get_jwt_identity()
         operation_id = request.args.get("operation_id")
 
-        if not database.db_operation_is_finished(operation_id):
+        if database.db_operation_is_failed(operation_id):
+            return jsonify({"error": "Video processing failed"}), 500
+
+        if not database.db_operation_is_complete(operation_id):
             return jsonify({"error": "Operation not finished yet"}), 404
 
         download_file = database.db_get_processed_video(user_email, operation_id)
         if not download_file:
             return jsonify({"error": "Video not found"}), 404
 
-        # Assuming processed_video_url is a relative path from the resources directory
-        resources_dir = os.path.join(
-            os.path.dirname(os.path.abspath(__file__)), "resources"
-        )
-        logging.info(f"download_video(): {resources_dir}")
-        full_path = os.path.join(resources_dir, download_file.strip("./"))
+        full_path = get_output_path(download_file)
         logging.info(f"download_video(): {full_path}")
 
         directory = os.path.dirname(full_path)
@@ -230,3 +277,53 @@ def download_video():
     except Exception as e:
         logging.error(f"download_video(): {e}")
         return jsonify({"error": "Internal Server Error"}), 500
+
+
+@bp.route("/user/stream_video", methods=["GET"])
+@jwt_required()
+def stream_video():
+    """
+    Stream a processed video file for a user while it is being processed.
+
+    Operations started with `fragmented` write a fragmented MP4, so every fragment
+    is playable as soon as it is on disk; the response follows the growing file
+    until FFmpeg is done. Finished operations are sent like `download_video`, and
+    other unfinished operations cannot be streamed.
+
+    Returns:
+        If the operation is finished, the video file as an attachment.
+        If the operation is fragmented and still running, a chunked video/mp4 response.
+        If the video is not found or not streamable yet, a JSON response with an error message and status code 404 is returned.
+        If processing the video failed, a JSON response with an error message and status code 500 is returned.
+        If any other error occurs, a JSON response with an error message and status code 500 is returned.
+    """
+    try:
+        user_email = get_jwt_identity()
+        operation_id = request.args.get("operation_id")
+
+        download_file = database.db_get_processed_video(user_email, operation_id)
+        if not download_file:
+            return jsonify({"error": "Video not found"}), 404
+
+        full_path = get_output_path(download_file)
+        logging.info(f"stream_video(): {full_path}")
+
+        if database.db_operation_is_failed(operation_id):
+            return jsonify({"error": "Video processing failed"}), 500
+
+        if database.db_operation_is_complete(operation_id):
+            directory = os.path.dirname(full_path)
+            filename = os.path.basename(full_path)
+            return send_from_directory(directory, filename, as_attachment=True)
+
+        if not database.db_operation_is_fragmented(operation_id):
+            return jsonify({"error": "Operation not finished yet"}), 404
+
+        return Response(
+            stream_with_context(follow_video_file(full_path, operation_id)),
+            mimetype="video/mp4",
+        )
+
+    except Exception as e:
+        logging.error(f"stream_video(): {e}")
+        return jsonify({"error": "Internal Server Error"}), 500
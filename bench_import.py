@@ -0,0 +1,60 @@
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+MODULES = ["worker", "ffmpeg", "api"]
+
+
+def time_import(module, runs):
+    """
+    Measure the cold import time of a module in fresh interpreters.
+
+    Args:
+        module (str): The module to import.
+        runs (int): Number of fresh interpreters to spawn.
+
+    Returns:
+        list or None: Import times in milliseconds, None if the import failed.
+    """
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import time; t = time.perf_counter(); "
+                f"import {module}; print((time.perf_counter() - t) * 1000)",
+            ],
+            capture_output=True,
+            text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+        if result.returncode != 0:
+            print(f"{module}: import failed\n{result.stderr.strip()}")
+            return None
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark module import time")
+    parser.add_argument("modules", nargs="*", default=MODULES)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for module in args.modules:
+        timings = time_import(module, args.runs)
+        if timings:
+            print(
+                f"{module}: median {statistics.median(timings):.1f} ms, "
+                f"min {min(timings):.1f} ms, max {max(timings):.1f} ms"
+            )
+    print(f"total: {(time.perf_counter() - start):.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import sqlite3
 import logging
 import os
+import time
 
 logging.basicConfig(level=logging.INFO)
 
+# Values of operations.finished
+OPERATION_RUNNING = 0
+OPERATION_FINISHED = 1
+OPERATION_FAILED = 2
+
 
 def db_initialize():
     """
@@ -44,10 +50,20 @@ def db_initialize():
                     end_time TEXT NOT NULL,
                     processed_video_url TEXT NOT NULL,
                     finished INTEGER NOT NULL DEFAULT 0,
+                    fragmented INTEGER NOT NULL DEFAULT 0,
+                    heartbeat REAL DEFAULT NULL,
                     FOREIGN KEY (user_id) REFERENCES users (id)
                 )
               """
         )
+        # databases created before these columns existed lack them
+        columns = [row[1] for row in c.execute("PRAGMA table_info(operations)")]
+        if "fragmented" not in columns:
+            c.execute(
+                "ALTER TABLE operations ADD COLUMN fragmented INTEGER NOT NULL DEFAULT 0"
+            )
+        if "heartbeat" not in columns:
+            c.execute("ALTER TABLE operations ADD COLUMN heartbeat REAL DEFAULT NULL")
         conn.commit()
     except Exception as e:
         logging.error(f"db_initialize(): Error initializing database: {e}")
@@ -156,7 +172,13 @@ def db_add_user(email, hashed_password):
 
 
 def db_add_operation(
-    user_id, video_url, start_time, end_time, processed_video_url, finished=0
+    user_id,
+    video_url,
+    start_time,
+    end_time,
+    processed_video_url,
+    finished=0,
+    fragmented=0,
 ):
     """
     Add an operation to the database.
@@ -168,6 +190,7 @@ def db_add_operation(
         end_time (str): The end time of the operation.
         processed_video_url (str): The URL of the processed video.
         finished (int, optional): The status of the operation. Defaults to 0(Unfinished).
+        fragmented (int, optional): Whether the output is a fragmented MP4. Defaults to 0.
 
     Returns:
         operation_id for the operation if the operation was successfully added, False otherwise.
@@ -177,11 +200,21 @@ def db_add_operation(
         conn = db_get_connection()
         c = conn.cursor()
         c.execute(
-            "INSERT INTO operations (user_id, video_url, start_time, end_time, processed_video_url, finished) VALUES (?, ?, ?, ?, ?, ?)",
-            (user_id, video_url, start_time, end_time, processed_video_url, finished),
+            "INSERT INTO operations (user_id, video_url, start_time, end_time, processed_video_url, finished, fragmented, heartbeat) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                user_id,
+                video_url,
+                start_time,
+                end_time,
+                processed_video_url,
+                finished,
+                int(bool(fragmented)),
+                time.time(),
+            ),
         )
+        operation_id = c.lastrowid
         conn.commit()
-        return True
+        return operation_id
     except Exception as e:
         logging.error(f"db_add_operation(): Error adding operation: {e}")
         return False
@@ -224,6 +257,35 @@ def db_get_operation_id(email, processed_video_url):
         conn.close()
 
 
+def db_get_operation(operation_id):
+    """
+    Retrieves the operation with the given ID together with the email of its user.
+
+    Args:
+        operation_id (int): The ID of the operation.
+
+    Returns:
+        sqlite3.Row: The operation row (with an extra `email` column) if found, None otherwise.
+    """
+    try:
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "SELECT operations.*, users.email FROM operations JOIN users ON users.id = operations.user_id WHERE operations.id=?",
+            (operation_id,),
+        )
+        operation = c.fetchone()
+        if operation:
+            return operation
+        else:
+            raise Exception("operation not found")
+    except Exception as e:
+        logging.error(f"db_get_operation(): Error getting operation: {e}")
+        return None
+    finally:
+        conn.close()
+
+
 def db_get_processed_video(email, operation_id):
     """
     Retrieves the processed video URL from the database for the given email and operation ID.
@@ -285,6 +347,94 @@ def db_set_operation_finished(email, output_file):
         conn.close()
 
 
+def db_set_operation_heartbeat(email, output_file):
+    """
+    Records that the specified operation is still being processed.
+
+    Args:
+        email (str): The email of the user.
+        output_file (str): The URL of the processed video file.
+
+    Returns:
+        bool: True if the operation was successfully updated, False otherwise.
+    """
+    try:
+        user_id = db_get_user_id(email)
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "UPDATE operations SET heartbeat=? WHERE operations.user_id=? AND operations.processed_video_url=?",
+            (time.time(), user_id, output_file),
+        )
+        conn.commit()
+        return True
+    except Exception as e:
+        logging.error(
+            f"db_set_operation_heartbeat(): Error setting operation heartbeat: {e}"
+        )
+        return False
+    finally:
+        conn.close()
+
+
+def db_set_operation_running(email, output_file):
+    """
+    Sets the 'finished' flag back to 0 (running) for the specified operation in the database.
+
+    Args:
+        email (str): The email of the user.
+        output_file (str): The URL of the processed video file.
+
+    Returns:
+        bool: True if the operation was successfully updated, False otherwise.
+    """
+    try:
+        user_id = db_get_user_id(email)
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "UPDATE operations SET finished=? WHERE operations.user_id=? AND operations.processed_video_url=?",
+            (OPERATION_RUNNING, user_id, output_file),
+        )
+        conn.commit()
+        logging.info(f"db_set_operation_running(): operation {output_file} running")
+        return True
+    except Exception as e:
+        logging.error(f"db_set_operation_running(): Error setting operation running: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def db_set_operation_failed(email, output_file):
+    """
+    Sets the 'finished' flag to 2 (failed) for the specified operation in the database.
+
+    Args:
+        email (str): The email of the user.
+        output_file (str): The URL of the processed video file.
+
+    Returns:
+        bool: True if the operation was successfully updated, False otherwise.
+    """
+    try:
+        user_id = db_get_user_id(email)
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "UPDATE operations SET finished=? WHERE operations.user_id=? AND operations.processed_video_url=?",
+            (OPERATION_FAILED, user_id, output_file),
+        )
+        conn.commit()
+        logging.info(f"db_set_operation_failed(): operation {output_file} failed")
+        return True
+    except Exception as e:
+        logging.error(f"db_set_operation_failed(): Error setting operation failed: {e}")
+        return False
+    finally:
+        conn.close()
+
+
 def db_get_subscription_info(email):
     """
     Retrieves the subscription info from the database for the given email.
@@ -334,7 +484,7 @@ def db_operation_is_complete(operation_id):
             (operation_id,),
         )
         finished = c.fetchone()
-        if finished == 1:
+        if finished and finished[0] == 1:
             logging.info("deb_operation_is_complete(): Retrieved finished")
             return True
         else:
@@ -345,4 +495,84 @@ def db_operation_is_complete(operation_id):
         )
         return None
     finally:
-        conn.close()
\ No newline at end of file
+        conn.close()
+
+
+def db_operation_is_fragmented(operation_id):
+    """
+    Checks if the operation with the given ID writes a fragmented MP4.
+
+    Args:
+        operation_id (int): The ID of the operation.
+
+    Returns:
+        bool: True if the output is fragmented, False otherwise.
+    """
+    try:
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "SELECT fragmented FROM operations WHERE operations.id=?",
+            (operation_id,),
+        )
+        fragmented = c.fetchone()
+        return bool(fragmented and fragmented[0] == 1)
+    except Exception as e:
+        logging.error(
+            f"db_operation_is_fragmented(): Error getting fragmented: {e}"
+        )
+        return False
+    finally:
+        conn.close()
+
+
+def db_operation_is_failed(operation_id):
+    """
+    Checks if the operation with the given ID failed.
+
+    Args:
+        operation_id (int): The ID of the operation.
+
+    Returns:
+        bool: True if the operation failed, False otherwise.
+    """
+    try:
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "SELECT finished FROM operations WHERE operations.id=?",
+            (operation_id,),
+        )
+        finished = c.fetchone()
+        return bool(finished and finished[0] == OPERATION_FAILED)
+    except Exception as e:
+        logging.error(f"db_operation_is_failed(): Error getting finished: {e}")
+        return False
+    finally:
+        conn.close()
+
+
+def db_get_operation_heartbeat(operation_id):
+    """
+    Retrieves the last time the operation with the given ID was reported alive.
+
+    Args:
+        operation_id (int): The ID of the operation.
+
+    Returns:
+        float: The heartbeat as a UNIX timestamp if found, None otherwise.
+    """
+    try:
+        conn = db_get_connection()
+        c = conn.cursor()
+        c.execute(
+            "SELECT heartbeat FROM operations WHERE operations.id=?",
+            (operation_id,),
+        )
+        heartbeat = c.fetchone()
+        return heartbeat[0] if heartbeat else None
+    except Exception as e:
+        logging.error(f"db_get_operation_heartbeat(): Error getting heartbeat: {e}")
+        return None
+    finally:
+        conn.close()
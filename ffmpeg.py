@@ -4,10 +4,13 @@ import os
 import logging
 import uuid
 import database
-import api
+import notification
 
 logging.basicConfig(level=logging.INFO)
 
+# How often a running operation reports itself alive (see stream.STREAM_HEARTBEAT_TIMEOUT)
+OPERATION_HEARTBEAT_INTERVAL = 5
+
 
 # Incase multiple user operate the same time, unique file name would be better than a static file name
 def create_unique_file(prefix="", extension=".mp4", parent_folder=""):
@@ -67,10 +70,20 @@ def create_unique_file(prefix="", extension=".mp4", parent_folder=""):
 #         logging.error(f"download_video(): Error downloading video: {e}")
 
 
-def ffmpeg_process_video(src_file, start_time, end_time, resouce_folder, output_file, user_email):
+def ffmpeg_process_video(
+    src_file,
+    start_time,
+    end_time,
+    resouce_folder,
+    output_file,
+    user_email,
+    fragmented=False,
+):
     """
     Process a video file using FFmpeg.
     Set the operation status to when the edit is done to finished in the database.
+    While FFmpeg runs, the operation heartbeat is refreshed every
+    OPERATION_HEARTBEAT_INTERVAL seconds so streams can tell it is still alive.
 
     Args:
         src_file (str): The source video file path.
@@ -79,30 +92,52 @@ def ffmpeg_process_video(src_file, start_time, end_time, resouce_folder, output_
         resouce_folder (str): The folder path where the FFmpeg command will be executed.
         output_file (str): The output file path for the processed video.
         user_email (str): The email address of the user.
+        fragmented (bool, optional): Write a fragmented MP4 (moov first, then
+            moof/mdat fragments) so the file can be streamed while it is
+            still being written. Defaults to False.
 
-    Raises:
-        Exception: If there is an error processing the video.
+    Returns:
+        bool: True if the video was processed, False otherwise. A failed run marks
+        the operation as failed instead of finished.
 
     """
     try:
         input_file = f"./input/{src_file}"
-        command = f"ffmpeg -hide_banner -loglevel error -i {input_file} -ss {start_time} -to {end_time} -c copy {output_file}"
+        movflags = (
+            "-movflags frag_keyframe+empty_moov+default_base_moof "
+            if fragmented
+            else ""
+        )
+        command = f"ffmpeg -y -hide_banner -loglevel error -i {input_file} -ss {start_time} -to {end_time} -c copy {movflags}{output_file}"
 
         logging.info(f"process_video(): Running command {command}")
-        subprocess.run(command, shell=True, cwd=resouce_folder)
+        database.db_set_operation_heartbeat(user_email, output_file)
+        process = subprocess.Popen(command, shell=True, cwd=resouce_folder)
+        while True:
+            try:
+                returncode = process.wait(timeout=OPERATION_HEARTBEAT_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                database.db_set_operation_heartbeat(user_email, output_file)
+        if returncode != 0:
+            raise Exception(f"ffmpeg exited with status {returncode}")
+
+        # mark finished first: the notification tells the user the video is ready
+        database.db_set_operation_finished(user_email, output_file)
 
         subscription_info = database.db_get_subscription_info(user_email)
-        if subscription_info.strip('"') == "None":
+        if subscription_info is not None and subscription_info.strip('"') == "None":
             subscription_info = None
 
         if subscription_info is not None:
-            api.send_push_notificatio(subscription_info, "Your Video is ready to download")
-
-        database.db_set_operation_finished(user_email, output_file)
+            notification.send_push_notificatio(subscription_info, "Your Video is ready to download")
 
         logging.info("process_video(): Video processed successfully")
+        return True
     except Exception as e:
         logging.error(f"process_video(): Error processing video: {e}")
+        database.db_set_operation_failed(user_email, output_file)
+        return False
     finally:
         # Do not store the original video for better privacy concern
         if os.path.exists(src_file):
@@ -0,0 +1,29 @@
+import logging
+
+logging.basicConfig(level=logging.INFO)
+
+
+def send_push_notificatio(subscription_info, msg):
+    """
+    Send a web push notification to the given subscription.
+
+    pywebpush (and the cryptography stack behind it) is imported on first use,
+    so importing this module stays cheap for processes that never notify.
+
+    Args:
+        subscription_info (str): The push subscription info of the user.
+        msg (str): The message to send.
+
+    Returns:
+        None
+    """
+    logging.info("send_push_notificatio(): Sending push notification")
+    try:
+        import pywebpush
+
+        pywebpush.webpush(
+            subscription_info=subscription_info,
+            data=msg,
+        )
+    except Exception as e:
+        logging.error(f"send_push_notificatio(): Error sending push notification: {e}")
@@ -1 +1 @@
-export FLASK_APP=api.py && flask run
+export FLASK_APP="api:create_app()" && flask run
@@ -0,0 +1,77 @@
+import os
+import time
+
+import database
+
+# Growing-file streaming: how much to read at once, how often to poll for new
+# fragments, and how old an unfinished operation's heartbeat may get before the
+# operation is considered dead (see ffmpeg.OPERATION_HEARTBEAT_INTERVAL)
+STREAM_CHUNK_SIZE = 64 * 1024
+STREAM_POLL_INTERVAL = 0.5
+STREAM_HEARTBEAT_TIMEOUT = 30
+
+
+def check_operation_alive(full_path, operation_id):
+    """
+    Abort a stream whose operation stopped reporting heartbeats.
+
+    Args:
+        full_path (str): The absolute path of the output file.
+        operation_id (int): The ID of the operation writing the file.
+
+    Raises:
+        Exception: If the operation heartbeat is missing or older than STREAM_HEARTBEAT_TIMEOUT seconds.
+    """
+    heartbeat = database.db_get_operation_heartbeat(operation_id)
+    if heartbeat is None or time.time() - heartbeat > STREAM_HEARTBEAT_TIMEOUT:
+        raise Exception(f"processing {full_path} stopped responding")
+
+
+def follow_video_file(full_path, operation_id):
+    """
+    Yield the content of a video file while FFmpeg is still writing it.
+
+    New data is read as it is appended; once the operation is marked finished the
+    remaining bytes are drained and the generator stops. If FFmpeg fails, the
+    operation is marked failed and the generator raises instead of ending cleanly.
+
+    Liveness is judged by the operation heartbeat rather than by file growth, since
+    FFmpeg may read through a long input before writing the first fragment. If the
+    heartbeat gets older than STREAM_HEARTBEAT_TIMEOUT (the processing thread or
+    worker died, or the server restarted mid-trim), the stream gives up. Giving up
+    raises inside the generator, so the chunked response is aborted and the client
+    sees a failed download instead of a clean, truncated file.
+
+    Args:
+        full_path (str): The absolute path of the output file.
+        operation_id (int): The ID of the operation writing the file.
+
+    Yields:
+        bytes: Chunks of the video file.
+
+    Raises:
+        Exception: If processing failed, the file is missing after the operation finished, or the stream gave up.
+    """
+    while not os.path.exists(full_path):
+        if database.db_operation_is_failed(operation_id):
+            raise Exception(f"processing {full_path} failed")
+        if database.db_operation_is_complete(operation_id):
+            raise Exception(f"{full_path} missing after the operation finished")
+        check_operation_alive(full_path, operation_id)
+        time.sleep(STREAM_POLL_INTERVAL)
+
+    with open(full_path, "rb") as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if chunk:
+                yield chunk
+                continue
+            if database.db_operation_is_complete(operation_id):
+                # the last fragment may have landed after the empty read above
+                while chunk := f.read(STREAM_CHUNK_SIZE):
+                    yield chunk
+                return
+            if database.db_operation_is_failed(operation_id):
+                raise Exception(f"processing {full_path} failed")
+            check_operation_alive(full_path, operation_id)
+            time.sleep(STREAM_POLL_INTERVAL)
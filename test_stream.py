@@ -0,0 +1,131 @@
+import threading
+import time
+
+import pytest
+
+import database
+import stream
+
+OUTPUT_FILE = "./output/video.mp4"
+EMAIL = "user@example.com"
+
+
+@pytest.fixture
+def operation(tmp_path, monkeypatch):
+    """
+    A running fragmented operation in a fresh database under tmp_path.
+
+    Returns:
+        tuple: (operation_id, full path of the output file)
+    """
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(stream, "STREAM_CHUNK_SIZE", 4)
+    monkeypatch.setattr(stream, "STREAM_POLL_INTERVAL", 0.01)
+    monkeypatch.setattr(stream, "STREAM_HEARTBEAT_TIMEOUT", 0.5)
+    database.db_initialize()
+    user_id = database.db_add_user(EMAIL, "password")
+    operation_id = database.db_add_operation(
+        user_id, "input.mp4", "00:00:00", "00:00:01", OUTPUT_FILE, fragmented=1
+    )
+    full_path = tmp_path / "resources" / "output" / "video.mp4"
+    full_path.write_bytes(b"ftypmoov")
+    return operation_id, str(full_path)
+
+
+def run_later(delay, *steps):
+    """Run the given callables one after another in a thread after delay seconds."""
+
+    def target():
+        time.sleep(delay)
+        for step in steps:
+            step()
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    return thread
+
+
+def append(full_path, data):
+    def step():
+        with open(full_path, "ab") as f:
+            f.write(data)
+
+    return step
+
+
+def test_follow_drains_tail_when_operation_finishes(operation):
+    operation_id, full_path = operation
+    thread = run_later(
+        0.1,
+        append(full_path, b"moofmdat"),
+        append(full_path, b"moofmdat-last"),
+        lambda: database.db_set_operation_finished(EMAIL, OUTPUT_FILE),
+    )
+
+    data = b"".join(stream.follow_video_file(full_path, operation_id))
+    thread.join()
+
+    assert data == b"ftypmoovmoofmdatmoofmdat-last"
+
+
+def test_follow_keeps_waiting_while_heartbeat_is_fresh(operation):
+    operation_id, full_path = operation
+
+    def heartbeat_then_finish():
+        # no new data for longer than the timeout, but the operation is alive
+        for _ in range(10):
+            database.db_set_operation_heartbeat(EMAIL, OUTPUT_FILE)
+            time.sleep(0.1)
+        append(full_path, b"moofmdat")()
+        database.db_set_operation_finished(EMAIL, OUTPUT_FILE)
+
+    thread = run_later(0, heartbeat_then_finish)
+
+    data = b"".join(stream.follow_video_file(full_path, operation_id))
+    thread.join()
+
+    assert data == b"ftypmoovmoofmdat"
+
+
+def test_follow_raises_when_ffmpeg_fails(operation):
+    operation_id, full_path = operation
+    thread = run_later(
+        0.1,
+        append(full_path, b"moofmd"),
+        lambda: database.db_set_operation_failed(EMAIL, OUTPUT_FILE),
+    )
+
+    received = []
+    with pytest.raises(Exception, match="failed"):
+        for chunk in stream.follow_video_file(full_path, operation_id):
+            received.append(chunk)
+    thread.join()
+
+    assert b"".join(received).startswith(b"ftypmoov")
+
+
+def test_follow_times_out_when_processing_dies(operation):
+    operation_id, full_path = operation
+    errors = []
+
+    def consume():
+        try:
+            list(stream.follow_video_file(full_path, operation_id))
+        except Exception as e:
+            errors.append(e)
+
+    # run in a daemon thread so a hanging follower fails the test instead of blocking it
+    thread = threading.Thread(target=consume, daemon=True)
+    thread.start()
+    thread.join(5)
+
+    assert not thread.is_alive()
+    assert len(errors) == 1 and "stopped responding" in str(errors[0])
+
+
+def test_follow_times_out_when_file_never_appears(operation):
+    operation_id, full_path = operation
+    database.db_set_operation_heartbeat(EMAIL, OUTPUT_FILE)
+
+    with pytest.raises(Exception, match="stopped responding"):
+        list(stream.follow_video_file(full_path + ".missing", operation_id))
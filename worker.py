@@ -0,0 +1,67 @@
+import argparse
+import logging
+import sys
+
+import database
+from ffmpeg import ffmpeg_process_video
+
+logging.basicConfig(level=logging.INFO)
+
+RES_FOLDER = "./resources"
+
+
+def main(argv=None):
+    """
+    Run a trim operation enqueued by the web app outside of the web app.
+
+    The operation (source, start/end time, output file, user and output mode) is
+    read from the database by its ID, so the API (started with ENQUEUE_ONLY=1) or
+    a queue only has to hand over the operation ID. Only the processing path
+    (ffmpeg, database, notification) is imported, so spawning a worker does not
+    build the Flask app. Finished operations are skipped and failed ones are
+    retried.
+
+    Args:
+        argv (list, optional): Command line arguments. Defaults to sys.argv.
+
+    Returns:
+        int: 0 if the operation is finished, 1 if it was not found or processing failed.
+    """
+    parser = argparse.ArgumentParser(description="Trim a video with FFmpeg")
+    parser.add_argument("operation_id", type=int, help="ID of the operation to process")
+    parser.add_argument(
+        "--resource-folder", default=RES_FOLDER, help="Folder FFmpeg runs in"
+    )
+    args = parser.parse_args(argv)
+
+    database.db_initialize()
+    operation = database.db_get_operation(args.operation_id)
+    if operation is None:
+        logging.error(f"worker(): Operation {args.operation_id} not found")
+        return 1
+
+    if operation["finished"] == database.OPERATION_FINISHED:
+        logging.info(f"worker(): Operation {args.operation_id} already finished")
+        return 0
+
+    if operation["finished"] == database.OPERATION_FAILED:
+        logging.info(f"worker(): Retrying failed operation {args.operation_id}")
+        database.db_set_operation_running(
+            operation["email"], operation["processed_video_url"]
+        )
+
+    logging.info(f"worker(): Processing operation {args.operation_id}")
+    processed = ffmpeg_process_video(
+        operation["video_url"],
+        operation["start_time"],
+        operation["end_time"],
+        args.resource_folder,
+        operation["processed_video_url"],
+        operation["email"],
+        bool(operation["fragmented"]),
+    )
+    return 0 if processed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())